@@ -7,17 +7,27 @@ Designed for n8n automation workflows.
 """
 
 import re
+import io
+import html
 import json
+import asyncio
 import subprocess
 import tempfile
 import os
 import logging
+import string
+import threading
 import traceback
 from datetime import datetime
 from typing import Optional, Dict, Any
+from xml.etree import ElementTree as ET
 
+import httpx
+from cachetools import TTLCache
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 import uvicorn
 
@@ -25,11 +35,56 @@ import uvicorn
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns used on every request
+_ID_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+_ID_ONLY_RE = re.compile(r'[A-Za-z0-9_-]{11}')
+_VIDEO_ID_RE = re.compile(r'(?:youtube\.com\/watch\?.*?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+# Caption text lines of a VTT/SRT file: skips blanks, headers, cue numbers and timestamps
+_VTT_CUE_BRE = re.compile(rb'^[ \t]*(?![ \t])(?!WEBVTT|NOTE|STYLE|\d+[ \t]*\r?$)(?![^\r\n]*-->)([^\r\n]+)', re.M)
+_TAG_STRIP_BRE = re.compile(rb'<[^>]+>')
+# Runs of [Music]-style and (noise)-style artifacts with their surrounding whitespace,
+# or plain whitespace runs, in one alternation
+_CLEAN_RE = re.compile(r'(?:\s*(?:\[[^\]]*\]|\([^)]*\)))+\s*|\s+')
+_SENTENCE_START_RE = re.compile(r'(?:^|\.\s+)([^\W\d_])')
+_PUNCT_RE = re.compile(r'\s+([,.!?])')
+_CAPTION_TRACKS_MARKER = b'"captionTracks":['
+_BASEURL_BRE = re.compile(rb'"baseUrl":"(.*?)"')
+
+COOKIES_PATH = "/app/cookies.txt"
+
+# (mtime, Cookie header) of the last parsed cookies file
+_cookie_cache: Optional[tuple[float, str]] = None
+_cookie_lock = threading.Lock()
+
+# Successful extraction results keyed by video_id; set TRANSCRIPT_CACHE_TTL=0 to disable
+TRANSCRIPT_CACHE_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", "3600"))
+_transcript_cache = TTLCache(maxsize=1024, ttl=max(TRANSCRIPT_CACHE_TTL, 1))
+_transcript_cache_lock = threading.Lock()
+
+# Extractions currently running, so concurrent requests for a video share one fetch
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Head start (seconds) each method gets over the next one when racing them
+METHOD_HEDGE_DELAY = 0.1
+
+_DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+# Upper bound on how much of a watch page is read while looking for captions
+MAX_HTML_BYTES = 4 * 1024 * 1024
+
+# Shared keep-alive client, opened on startup and closed on shutdown
+_http_client: Optional[httpx.AsyncClient] = None
+
 
 app = FastAPI(
     title="YouTube Transcript Extractor API",
     description="Extract transcripts from YouTube videos using multiple fallback methods",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware for n8n compatibility
@@ -41,6 +96,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress transcript payloads for clients sending Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+@app.on_event("startup")
+async def open_http_client():
+    """Create the pooled HTTP client shared by all requests."""
+    global _http_client
+    _http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        headers=_DEFAULT_HEADERS,
+        verify=False,
+        follow_redirects=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    )
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close the pooled HTTP client."""
+    if _http_client is not None:
+        await _http_client.aclose()
+
 
 class TranscriptRequest(BaseModel):
     video_id: str = Field(..., description="YouTube video ID or URL")
@@ -56,34 +135,74 @@ class TranscriptResponse(BaseModel):
     character_count: Optional[int] = None
     errors: Optional[list] = None
     error: Optional[str] = None
+    cache_hit: Optional[bool] = None
 
 
 def extract_video_id(url_or_id: str) -> str:
     """Extract video ID from YouTube URL or return ID if already provided."""
-    if len(url_or_id) == 11 and not '/' in url_or_id:
+    if _ID_ONLY_RE.fullmatch(url_or_id):
         return url_or_id
     
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/watch\?.*v=([a-zA-Z0-9_-]{11})'
-    ]
+    # Common URL shapes are handled with plain string ops
+    i = url_or_id.find('youtube.com/watch?')
+    if i >= 0:
+        query_start = i + len('youtube.com/watch')
+        for marker in ('?v=', '&v='):
+            j = url_or_id.find(marker, query_start)
+            if j >= 0:
+                candidate = url_or_id[j + 3:j + 14]
+                if len(candidate) == 11 and _ID_CHARS.issuperset(candidate):
+                    return candidate
     
-    for pattern in patterns:
-        match = re.search(pattern, url_or_id)
-        if match:
-            return match.group(1)
+    i = url_or_id.find('youtu.be/')
+    if i >= 0:
+        candidate = url_or_id[i + 9:i + 20]
+        if len(candidate) == 11 and _ID_CHARS.issuperset(candidate):
+            return candidate
+    
+    match = _VIDEO_ID_RE.search(url_or_id)
+    if match:
+        return match.group(1)
     
     raise ValueError("Invalid YouTube URL or video ID")
 
 
-def get_transcript_youtube_api(video_id: str) -> tuple[str, str]:
+def _get_cookie_header() -> str:
+    """Build the youtube.com Cookie header, re-parsing the cookies file only when it changes."""
+    global _cookie_cache
+    
+    try:
+        mtime = os.stat(COOKIES_PATH).st_mtime
+    except OSError:
+        return ""
+    
+    with _cookie_lock:
+        if _cookie_cache is None or _cookie_cache[0] != mtime:
+            cookie_parts = []
+            with open(COOKIES_PATH, 'r') as f:
+                for line in f:
+                    if line.startswith('#') or not line.strip():
+                        continue
+                    parts = line.strip().split('\t')
+                    if len(parts) >= 7 and 'youtube.com' in parts[0]:
+                        cookie_parts.append(f"{parts[5]}={parts[6]}")
+            _cookie_cache = (mtime, "; ".join(cookie_parts))
+        return _cookie_cache[1]
+
+
+async def get_transcript_youtube_api(video_id: str) -> tuple[str, str]:
     """Method 1: Try youtube_transcript_api with cookies."""
+    # The library is blocking, keep it off the event loop
+    return await asyncio.to_thread(_fetch_transcript_youtube_api, video_id)
+
+
+def _fetch_transcript_youtube_api(video_id: str) -> tuple[str, str]:
+    """Blocking youtube_transcript_api lookup used by get_transcript_youtube_api."""
     try:
         from youtube_transcript_api import YouTubeTranscriptApi
         
         # Load cookies if available
-        cookies_path = "/app/cookies.txt"
-        cookies = cookies_path if os.path.exists(cookies_path) else None
+        cookies = COOKIES_PATH if os.path.exists(COOKIES_PATH) else None
         
         if cookies:
             logger.info("Using cookies file for YouTube Transcript API")
@@ -121,86 +240,68 @@ def get_transcript_youtube_api(video_id: str) -> tuple[str, str]:
         raise Exception(f"YouTube Transcript API failed: {e}")
 
 
-def get_transcript_yt_dlp(video_id: str) -> tuple[str, str]:
+async def get_transcript_yt_dlp(video_id: str) -> tuple[str, str]:
     """Method 2: Direct HTTP approach to get captions."""
     try:
-        import urllib.request
-        import urllib.parse
-        import ssl
-        import json
-        
-        # Create SSL context that ignores certificate verification
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
         # Headers to mimic a browser request
         headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive'
         }
         
         # Add cookies if available
-        cookies_str = ""
-        cookies_path = "/app/cookies.txt"
-        if os.path.exists(cookies_path):
-            with open(cookies_path, 'r') as f:
-                cookie_parts = []
-                for line in f:
-                    if line.startswith('#') or not line.strip():
-                        continue
-                    parts = line.strip().split('\t')
-                    if len(parts) >= 7:
-                        domain, _, path, secure, expires, name, value = parts[:7]
-                        if 'youtube.com' in domain:
-                            cookie_parts.append(f"{name}={value}")
-                cookies_str = "; ".join(cookie_parts)
-                if cookies_str:
-                    headers['Cookie'] = cookies_str
-                    logger.info("Using cookies for direct HTTP request")
+        cookies_str = _get_cookie_header()
+        if cookies_str:
+            headers['Cookie'] = cookies_str
+            logger.info("Using cookies for direct HTTP request")
         
         # First, get the YouTube page to extract caption info
         video_url = f"https://www.youtube.com/watch?v={video_id}"
-        request = urllib.request.Request(video_url, headers=headers)
         
         try:
-            with urllib.request.urlopen(request, context=ssl_context, timeout=30) as response:
-                html_content = response.read().decode('utf-8')
-                
-                # Look for caption tracks in the HTML
-                import re
-                caption_pattern = r'"captions":.*?"playerCaptionsTracklistRenderer":.*?"captionTracks":\[(.*?)\]'
-                match = re.search(caption_pattern, html_content)
+            # Stream the page as bytes and stop once the caption tracks block is complete;
+            # only the caption URL gets decoded
+            html_content = bytearray()
+            start = end = -1
+            async with _http_client.stream('GET', video_url, headers=headers) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(65536):
+                    offset = len(html_content)
+                    html_content += chunk
+                    
+                    # Look for caption tracks in the HTML, only scanning the new bytes
+                    if start < 0:
+                        start = html_content.find(_CAPTION_TRACKS_MARKER, max(offset - len(_CAPTION_TRACKS_MARKER), 0))
+                    if start >= 0:
+                        end = html_content.find(b']', max(start, offset))
+                        if end >= 0:
+                            break
+                    
+                    if len(html_content) >= MAX_HTML_BYTES:
+                        break
+            
+            if end >= 0:
+                # Extract the first English caption URL
+                url_match = _BASEURL_BRE.search(html_content, start, end)
                 
-                if match:
-                    captions_data = match.group(1)
-                    # Extract the first English caption URL
-                    url_pattern = r'"baseUrl":"(.*?)"'
-                    url_match = re.search(url_pattern, captions_data)
+                if url_match:
+                    caption_url = url_match.group(1).decode('utf-8').replace('\\u0026', '&')
+                    logger.info("Found caption URL (prefix): %.100s", caption_url)
                     
-                    if url_match:
-                        caption_url = url_match.group(1).replace('\\u0026', '&')
-                        logger.info(f"Found caption URL: {caption_url[:100]}...")
-                        
-                        # Download the caption file
-                        caption_request = urllib.request.Request(caption_url, headers=headers)
-                        with urllib.request.urlopen(caption_request, context=ssl_context, timeout=30) as caption_response:
-                            caption_content = caption_response.read().decode('utf-8')
-                            
-                            # Parse XML captions
-                            text = parse_youtube_captions(caption_content)
-                            if text:
-                                return text, "direct_http"
-                            else:
-                                raise Exception("No text found in caption content")
+                    # Download the caption file
+                    caption_response = await _http_client.get(caption_url, headers=headers)
+                    caption_response.raise_for_status()
+                    
+                    # Parse XML captions
+                    text = parse_youtube_captions(caption_response.content)
+                    if text:
+                        return text, "direct_http"
                     else:
-                        raise Exception("No caption URL found in page")
+                        raise Exception("No text found in caption content")
                 else:
-                    raise Exception("No captions section found in page")
-                    
+                    raise Exception("No caption URL found in page")
+            else:
+                raise Exception("No captions section found in page")
+                
         except Exception as e:
             raise Exception(f"HTTP request failed: {str(e)}")
             
@@ -208,88 +309,54 @@ def get_transcript_yt_dlp(video_id: str) -> tuple[str, str]:
         raise Exception(f"Direct HTTP method failed: {e}")
 
 
-def parse_youtube_captions(xml_content: str) -> str:
+def parse_youtube_captions(xml_content: bytes) -> str:
     """Parse YouTube XML caption format."""
-    import re
-    
-    # Remove XML tags and extract text
-    text_pattern = r'<text[^>]*>(.*?)</text>'
-    matches = re.findall(text_pattern, xml_content, re.DOTALL)
-    
     text_parts = []
-    for match in matches:
-        # Clean HTML entities and tags
-        clean_text = re.sub(r'&[a-zA-Z]+;', '', match)
-        clean_text = re.sub(r'<[^>]+>', '', clean_text)
-        clean_text = clean_text.strip()
-        if clean_text:
-            text_parts.append(clean_text)
+    for _, element in ET.iterparse(io.BytesIO(xml_content), events=('end',)):
+        if element.tag == 'text' or element.tag.endswith('}text'):
+            # Entities are often double-escaped and may wrap <font> tags
+            if element.text:
+                clean_text = _HTML_TAG_RE.sub('', html.unescape(element.text)).strip()
+                if clean_text:
+                    text_parts.append(clean_text)
+            element.clear()
     
     return ' '.join(text_parts)
 
 
 def clean_subtitle_content(content: str) -> str:
     """Clean subtitle content (VTT/SRT format)."""
-    lines = content.split('\n')
-    text_lines = []
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
     
-    for line in lines:
-        line = line.strip()
-        # Skip empty lines, timestamps, and VTT headers
-        if (not line or 
-            line.startswith('WEBVTT') or 
-            '-->' in line or 
-            line.isdigit() or
-            line.startswith('NOTE') or
-            line.startswith('STYLE')):
-            continue
-        
-        # Remove HTML tags and formatting
-        line = re.sub(r'<[^>]+>', '', line)
-        line = re.sub(r'&[a-zA-Z]+;', '', line)
-        
-        if line:
-            text_lines.append(line)
+    # Decode entities such as &amp; and &#39; before stripping tags, as parse_youtube_captions does
+    raw = html.unescape(content).encode('utf-8')
+    
+    # Remove HTML tags and formatting from each caption text line; strip in str space so a
+    # decoded &nbsp; (U+00A0) counts as whitespace
+    parts = (_TAG_STRIP_BRE.sub(b'', m.group(1)).decode('utf-8').strip() for m in _VTT_CUE_BRE.finditer(raw))
     
-    return ' '.join(text_lines)
+    return ' '.join(p for p in parts if p)
 
 
 def clean_transcript_text(text: str) -> str:
     """Clean and format transcript text."""
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove common subtitle artifacts
-    text = re.sub(r'\[.*?\]', '', text)  # Remove [Music], [Applause], etc.
-    text = re.sub(r'\(.*?\)', '', text)  # Remove (background noise), etc.
+    # Collapse whitespace and remove [Music], (background noise), etc. in a single scan
+    text = _CLEAN_RE.sub(' ', text)
     
     # Clean up punctuation
-    text = re.sub(r'\s+([,.!?])', r'\1', text)
+    text = _PUNCT_RE.sub(r'\1', text)
     
     # Capitalize sentences
-    sentences = text.split('. ')
-    cleaned_sentences = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if sentence:
-            sentence = sentence[0].upper() + sentence[1:]
-            cleaned_sentences.append(sentence)
+    text = _SENTENCE_START_RE.sub(lambda m: m.group(0)[:-1] + m.group(1).upper(), text.strip())
     
-    return '. '.join(cleaned_sentences).strip()
+    return text
 
 
-def get_transcript_direct_api(video_id: str) -> tuple[str, str]:
+# Not in the method list: it cannot parse the innertube response yet and always raises
+async def get_transcript_direct_api(video_id: str) -> tuple[str, str]:
     """Method 3: Direct YouTube API approach."""
     try:
-        import urllib.request
-        import ssl
-        import json
-        
-        # Create SSL context that ignores certificate verification
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
         # Try the innertube API that YouTube uses internally
         api_url = "https://www.youtube.com/youtubei/v1/get_transcript"
         
@@ -305,68 +372,118 @@ def get_transcript_direct_api(video_id: str) -> tuple[str, str]:
         }
         
         headers = {
-            'Content-Type': 'application/json',
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': '*/*',
             'Accept-Language': 'en-US,en;q=0.9'
         }
         
         # Add cookies if available
-        cookies_path = "/app/cookies.txt"
-        if os.path.exists(cookies_path):
-            with open(cookies_path, 'r') as f:
-                cookie_parts = []
-                for line in f:
-                    if line.startswith('#') or not line.strip():
-                        continue
-                    parts = line.strip().split('\t')
-                    if len(parts) >= 7:
-                        domain, _, path, secure, expires, name, value = parts[:7]
-                        if 'youtube.com' in domain:
-                            cookie_parts.append(f"{name}={value}")
-                cookies_str = "; ".join(cookie_parts)
-                if cookies_str:
-                    headers['Cookie'] = cookies_str
+        cookies_str = _get_cookie_header()
+        if cookies_str:
+            headers['Cookie'] = cookies_str
         
         # Make the request
-        req_data = json.dumps(data).encode('utf-8')
-        request = urllib.request.Request(api_url, data=req_data, headers=headers)
+        response = await _http_client.post(api_url, json=data, headers=headers)
+        response.raise_for_status()
+        result = response.json()
         
-        with urllib.request.urlopen(request, context=ssl_context, timeout=30) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            
-            # Extract transcript text
-            if 'actions' in result:
-                text_parts = []
-                for action in result['actions']:
-                    if 'updateEngagementPanelAction' in action:
-                        content = action['updateEngagementPanelAction'].get('content', {})
-                        # Navigate through the complex structure to find transcript text
-                        # This is a simplified extraction - the actual structure may vary
-                        
-                # For now, return a simple message indicating the method was attempted
-                return "Direct API method reached YouTube, but transcript extraction needs refinement", "direct_api"
-            
-            raise Exception("No transcript data found in API response")
+        # Extract transcript text
+        if 'actions' in result:
+            text_parts = []
+            for action in result['actions']:
+                if 'updateEngagementPanelAction' in action:
+                    content = action['updateEngagementPanelAction'].get('content', {})
+                    # Navigate through the complex structure to find transcript text
+                    # This is a simplified extraction - the actual structure may vary
+                    
+            # Transcript extraction from the panel structure is not implemented yet
+            raise Exception("Direct API method reached YouTube, but transcript extraction needs refinement")
+        
+        raise Exception("No transcript data found in API response")
             
     except Exception as e:
         raise Exception(f"Direct API method failed: {e}")
 
 
-def extract_transcript_internal(video_id: str) -> Dict[str, Any]:
-    """Try multiple methods to extract transcript."""
+async def extract_transcript_internal(video_id: str) -> Dict[str, Any]:
+    """Return a cached transcript if available, otherwise extract and cache it.
+    
+    Concurrent calls for the same video_id share a single extraction.
+    """
+    if TRANSCRIPT_CACHE_TTL > 0:
+        with _transcript_cache_lock:
+            cached = _transcript_cache.get(video_id)
+        if cached is not None:
+            logger.info("Transcript cache hit for %s", video_id)
+            return {**cached, "cache_hit": True}
+    
+    task = _inflight.get(video_id)
+    if task is None:
+        # The extraction runs as its own task so no single caller's cancellation stops it
+        task = asyncio.create_task(_extract_transcript_uncached(video_id))
+        task.add_done_callback(lambda t: _finish_extraction(video_id, t))
+        _inflight[video_id] = task
+    else:
+        logger.info("Joining in-flight extraction for %s", video_id)
+    
+    # Shield so a cancelled caller does not cancel the shared extraction
+    result = await asyncio.shield(task)
+    return {**result, "cache_hit": False}
+
+
+def _finish_extraction(video_id: str, task: asyncio.Task):
+    """Cache a finished extraction and drop it from the in-flight table."""
+    _inflight.pop(video_id, None)
+    
+    # Checking exception() also marks it retrieved when every caller went away
+    if task.cancelled() or task.exception() is not None:
+        return
+    
+    result = task.result()
+    if result["success"] and TRANSCRIPT_CACHE_TTL > 0:
+        with _transcript_cache_lock:
+            _transcript_cache[video_id] = result
+
+
+async def _run_method(method_name: str, method_func, video_id: str, delay: float):
+    """Run one extraction method after a hedging delay, returning its outcome instead of raising."""
+    if delay:
+        await asyncio.sleep(delay)
+    try:
+        return method_name, await method_func(video_id), None
+    except Exception as e:
+        return method_name, None, e
+
+
+async def _extract_transcript_uncached(video_id: str) -> Dict[str, Any]:
+    """Race multiple methods to extract transcript, returning the first success."""
     methods = [
         ("YouTube Transcript API", get_transcript_youtube_api),
         ("Direct HTTP", get_transcript_yt_dlp),
-        ("Direct API", get_transcript_direct_api)
     ]
     
     errors = []
     
-    for method_name, method_func in methods:
-        try:
-            text, source = method_func(video_id)
+    # Earlier methods get a small head start so the cheap path usually wins unhedged
+    tasks = [
+        asyncio.create_task(_run_method(method_name, method_func, video_id, i * METHOD_HEDGE_DELAY))
+        for i, (method_name, method_func) in enumerate(methods)
+    ]
+    
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            method_name, outcome, error = await next_done
+            
+            if error is not None:
+                error_msg = f"{method_name}: {str(error)}"
+                errors.append(error_msg)
+                # A failing method is the normal fallback path, not an error
+                logger.debug("Method %s failed: %s", method_name, error)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Traceback: %s", ''.join(traceback.format_exception(error)))
+                continue
             
+            text, source = outcome
             if text and text.strip():
                 cleaned_text = clean_transcript_text(text)
                 return {
@@ -378,12 +495,12 @@ def extract_transcript_internal(video_id: str) -> Dict[str, Any]:
                     "word_count": len(cleaned_text.split()),
                     "character_count": len(cleaned_text)
                 }
-        except Exception as e:
-            error_msg = f"{method_name}: {str(e)}"
-            errors.append(error_msg)
-            logger.error(f"Error in {method_name}: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+    finally:
+        # Stop the methods that are still running once we have an answer
+        for task in tasks:
+            task.cancel()
     
+    logger.warning("All methods failed for %s: %s", video_id, errors)
     return {
         "success": False,
         "video_id": video_id,
@@ -409,16 +526,24 @@ async def health():
     return {"status": "ok"}
 
 
-@app.post("/extract", response_model=TranscriptResponse, tags=["Transcript"])
+@app.post("/extract", responses={200: {"model": TranscriptResponse}}, tags=["Transcript"])
 async def extract_transcript(request: TranscriptRequest):
     """
     Extract transcript from YouTube video.
     
     - **video_id**: YouTube video ID or full URL
     """
+    # Reject malformed IDs before doing any network work
     try:
         video_id = extract_video_id(request.video_id)
-        result = extract_transcript_internal(video_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={
+            "message": "Invalid video ID or URL",
+            "error": str(e)
+        })
+    
+    try:
+        result = await extract_transcript_internal(video_id)
         
         if not result["success"]:
             raise HTTPException(status_code=404, detail={
@@ -427,16 +552,13 @@ async def extract_transcript(request: TranscriptRequest):
                 "video_id": video_id
             })
         
-        return TranscriptResponse(**result)
+        # result already has the TranscriptResponse shape; skip re-validating the transcript
+        return ORJSONResponse(content=result)
         
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail={
-            "message": "Invalid video ID or URL",
-            "error": str(e)
-        })
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Unexpected error in extract_transcript: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error in extract_transcript: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail={
             "message": "Internal server error",
             "error": str(e),
@@ -444,7 +566,7 @@ async def extract_transcript(request: TranscriptRequest):
         })
 
 
-@app.get("/extract", response_model=TranscriptResponse, tags=["Transcript"])
+@app.get("/extract", responses={200: {"model": TranscriptResponse}}, tags=["Transcript"])
 async def extract_transcript_get(
     video_id: str = Query(..., description="YouTube video ID or URL")
 ):
@@ -454,12 +576,11 @@ async def extract_transcript_get(
     - **video_id**: YouTube video ID or full URL
     """
     try:
-        logger.info(f"GET request for video_id: {video_id}")
+        logger.info("GET request for video_id: %s", video_id)
         request = TranscriptRequest(video_id=video_id)
         return await extract_transcript(request)
     except Exception as e:
-        logger.error(f"Error in extract_transcript_get: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error in extract_transcript_get: %s", e, exc_info=True)
         raise
 
 
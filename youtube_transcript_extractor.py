@@ -3,38 +3,141 @@
 YouTube Transcript Extractor
 
 This script extracts transcripts from YouTube videos using multiple methods and outputs JSON.
-Usage: python youtube_transcript_extractor.py <video_url_or_id>
+Usage: python youtube_transcript_extractor.py [--no-cache] <video_url_or_id>
 """
 
 import sys
 import re
+import asyncio
+import html
 import json
-import subprocess
-import tempfile
 import os
+import queue
+import string
+import threading
+import time
+import urllib.request
+from xml.etree import ElementTree as ET
 from datetime import datetime
 
+# Bulk substitutions over downloaded subtitle text use RE2 (linear time, no
+# backtracking) when google-re2 is installed
+try:
+    import re2 as _bulk_re
+except ImportError:
+    _bulk_re = re
+
+# Successful results are cached on disk when diskcache is installed
+CACHE_DIR = os.path.expanduser('~/.cache/yt-extractor')
+CACHE_EXPIRE = 7 * 86400
+
+# One Cache handle is opened lazily and shared; False means diskcache is unavailable
+_cache = None
+
+TIMEDTEXT_URL = "https://www.youtube.com/api/timedtext?lang=en&v={video_id}"
+# The timedtext fetch is speculative, so it must not hold up the library fallback for long
+TIMEDTEXT_TIMEOUT = 5
+
+# Head start (seconds) each method gets before the next one is started, unless
+# an earlier method fails sooner
+METHOD_HEDGE_DELAY = 3.0
+
+SUBTITLE_LANGS = ['en', 'en-US', 'en-GB']
+YDL_OPTS = {
+    'skip_download': True,
+    'writesubtitles': True,
+    'writeautomaticsub': True,
+    'subtitleslangs': SUBTITLE_LANGS,
+    'subtitlesformat': 'vtt',
+    'quiet': True,
+    'no_warnings': True,
+}
+
+# One YoutubeDL instance is reused across videos; it is not thread-safe
+_ydl = None
+_ydl_lock = threading.Lock()
+
+_ID_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+
+# Precompiled patterns
+_URL_PATTERNS = [re.compile(p) for p in (
+    r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
+    r'youtube\.com\/watch\?.*v=([a-zA-Z0-9_-]{11})'
+)]
+# HTML tags; entities are decoded separately
+_TAG_RE = _bulk_re.compile(r'<[^>\n]+>')
+# VTT/SRT headers, cue numbers and timestamp lines
+_VTT_LINE_KILL_RE = _bulk_re.compile(r'(?m)^[ \t]*(?:WEBVTT.*|NOTE.*|STYLE.*|\d+[ \t\r]*|.*-->.*)$')
+# [Music], [Applause], (background noise), etc.
+_BRACKETS_RE = _bulk_re.compile(r'\[[^\]]*\]|\([^)]*\)')
+_PUNCT_RE = re.compile(r'\s+([,.!?])')
+# First letter of the text and of each sentence after . ! or ?
+_CAP_RE = re.compile(r'(?:^|(?<=[.!?]\s))[^\W\d_]')
+
 
 def extract_video_id(url_or_id):
     """Extract video ID from YouTube URL or return ID if already provided."""
     if len(url_or_id) == 11 and not '/' in url_or_id:
         return url_or_id
     
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/watch\?.*v=([a-zA-Z0-9_-]{11})'
-    ]
+    # youtube.com/watch?...v=<id> and youtu.be/<id> are sliced directly without running a regex
+    i = url_or_id.find('youtube.com/watch?')
+    if i >= 0:
+        query_start = i + len('youtube.com/watch')
+        for marker in ('?v=', '&v='):
+            j = url_or_id.find(marker, query_start)
+            if j >= 0:
+                candidate = url_or_id[j + 3:j + 14]
+                if len(candidate) == 11 and _ID_CHARS.issuperset(candidate):
+                    return candidate
+    
+    i = url_or_id.find('youtu.be/')
+    if i >= 0:
+        candidate = url_or_id[i + 9:i + 20]
+        if len(candidate) == 11 and _ID_CHARS.issuperset(candidate):
+            return candidate
     
-    for pattern in patterns:
-        match = re.search(pattern, url_or_id)
+    for pattern in _URL_PATTERNS:
+        match = pattern.search(url_or_id)
         if match:
             return match.group(1)
     
     raise ValueError("Invalid YouTube URL or video ID")
 
 
+def _fetch_timedtext(video_id):
+    """Fetch English captions from the timedtext endpoint and join the cue text."""
+    url = TIMEDTEXT_URL.format(video_id=video_id)
+    with urllib.request.urlopen(url, timeout=TIMEDTEXT_TIMEOUT) as response:
+        xml_bytes = response.read()
+    
+    return _parse_timedtext(xml_bytes)
+
+
+def _parse_timedtext(xml_bytes):
+    """Join the cue text of a timedtext XML document."""
+    # The endpoint answers with an empty body when there is no matching track
+    if not xml_bytes.strip():
+        return ""
+    
+    root = ET.fromstring(xml_bytes)
+    # Cue text is escaped twice (e.g. &amp;#39;), ElementTree only undoes the first level;
+    # the decoded text can carry styling markup such as <font>
+    parts = (_TAG_RE.sub('', html.unescape(t.text)).strip() for t in root.iter('text') if t.text)
+    return ' '.join(p for p in parts if p)
+
+
 def get_transcript_youtube_api(video_id):
-    """Method 1: Try youtube_transcript_api."""
+    """Method 1: Try the raw timedtext XML, then youtube_transcript_api."""
+    # The raw XML skips the library's per-cue dict construction
+    try:
+        text = _fetch_timedtext(video_id)
+        if text.strip():
+            return text, "timedtext"
+        timedtext_error = "no text in response"
+    except Exception as e:
+        timedtext_error = str(e)
+    
     try:
         from youtube_transcript_api import YouTubeTranscriptApi
         
@@ -66,58 +169,52 @@ def get_transcript_youtube_api(video_id):
         raise Exception("No text found in transcript data")
         
     except ImportError:
-        raise Exception("youtube_transcript_api not installed")
+        raise Exception(f"youtube_transcript_api not installed (timedtext: {timedtext_error})")
     except Exception as e:
-        raise Exception(f"YouTube Transcript API failed: {e}")
+        raise Exception(f"YouTube Transcript API failed: {e} (timedtext: {timedtext_error})")
+
+
+def _get_ydl():
+    """Return the shared YoutubeDL instance, creating it on first use."""
+    global _ydl
+    if _ydl is None:
+        from yt_dlp import YoutubeDL
+        _ydl = YoutubeDL(YDL_OPTS)
+    return _ydl
 
 
 def get_transcript_yt_dlp(video_id):
     """Method 2: Try yt-dlp to extract subtitles."""
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Try to download subtitles using yt-dlp
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-            output_template = os.path.join(temp_dir, "%(title)s.%(ext)s")
-            
-            cmd = [
-                "yt-dlp",
-                "--write-auto-subs",
-                "--write-subs",
-                "--sub-langs", "en",
-                "--skip-download",
-                "--output", output_template,
-                video_url
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode != 0:
-                raise Exception(f"yt-dlp failed: {result.stderr}")
+        # Resolve subtitle URLs in-process instead of spawning the yt-dlp CLI
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
+        
+        with _ydl_lock:
+            ydl = _get_ydl()
+            info = ydl.extract_info(video_url, download=False)
             
-            # Look for subtitle files
-            subtitle_files = []
-            for file in os.listdir(temp_dir):
-                if file.endswith(('.vtt', '.srt')):
-                    subtitle_files.append(os.path.join(temp_dir, file))
+            requested = info.get('requested_subtitles') or {}
+            track = next((requested[lang] for lang in SUBTITLE_LANGS if lang in requested), None)
             
-            if not subtitle_files:
+            if not track or not (track.get('data') or track.get('url')):
                 raise Exception("No subtitle files found")
             
-            # Read the first subtitle file
-            with open(subtitle_files[0], 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Clean VTT/SRT format
-            text = clean_subtitle_content(content)
-            
-            if text:
-                return text, "yt-dlp"
-            else:
-                raise Exception("No text extracted from subtitle file")
+            # Use inlined subtitle data if present, otherwise fetch the track into memory
+            # through yt-dlp's own opener so headers and cookies match the info request
+            content = track.get('data')
+            if content is None:
+                with ydl.urlopen(track['url']) as response:
+                    content = response.read().decode('utf-8')
+        
+        # Clean VTT/SRT format
+        text = clean_subtitle_content(content)
+        
+        if text:
+            return text, "yt-dlp"
+        else:
+            raise Exception("No text extracted from subtitle file")
                 
-    except subprocess.TimeoutExpired:
-        raise Exception("yt-dlp timeout")
-    except FileNotFoundError:
+    except ImportError:
         raise Exception("yt-dlp not installed")
     except Exception as e:
         raise Exception(f"yt-dlp method failed: {e}")
@@ -125,56 +222,72 @@ def get_transcript_yt_dlp(video_id):
 
 def clean_subtitle_content(content):
     """Clean subtitle content (VTT/SRT format)."""
-    lines = content.split('\n')
-    text_lines = []
+    # Decode entities such as &amp; and &#39; first, matching the timedtext parser
+    text = html.unescape(content)
     
-    for line in lines:
-        line = line.strip()
-        # Skip empty lines, timestamps, and VTT headers
-        if (not line or 
-            line.startswith('WEBVTT') or 
-            '-->' in line or 
-            line.isdigit() or
-            line.startswith('NOTE') or
-            line.startswith('STYLE')):
-            continue
-        
-        # Remove HTML tags and formatting
-        line = re.sub(r'<[^>]+>', '', line)
-        line = re.sub(r'&[a-zA-Z]+;', '', line)
-        
-        if line:
-            text_lines.append(line)
+    # Blank out VTT headers, cue numbers and timestamps across the whole buffer
+    text = _VTT_LINE_KILL_RE.sub('', text)
     
-    return ' '.join(text_lines)
+    # Remove HTML tags and formatting
+    text = _TAG_RE.sub('', text)
+    
+    return ' '.join(text.split())
 
 
 def clean_transcript_text(text):
     """Clean and format transcript text."""
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    # Remove common subtitle artifacts; most API cue text has none, so skip the
+    # regex pass unless an opening bracket or paren is present at all
+    if '[' in text or '(' in text:
+        text = _BRACKETS_RE.sub('', text)
     
-    # Remove common subtitle artifacts
-    text = re.sub(r'\[.*?\]', '', text)  # Remove [Music], [Applause], etc.
-    text = re.sub(r'\(.*?\)', '', text)  # Remove (background noise), etc.
+    # Remove extra whitespace, including gaps left by the removed artifacts
+    text = ' '.join(text.split())
     
     # Clean up punctuation
-    text = re.sub(r'\s+([,.!?])', r'\1', text)
+    text = _PUNCT_RE.sub(r'\1', text)
     
     # Capitalize sentences
-    sentences = text.split('. ')
-    cleaned_sentences = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if sentence:
-            sentence = sentence[0].upper() + sentence[1:]
-            cleaned_sentences.append(sentence)
+    return _CAP_RE.sub(lambda m: m.group(0).upper(), text)
+
+
+def _get_cache():
+    """Return the shared on-disk transcript cache, or None if diskcache is not installed."""
+    global _cache
+    if _cache is None:
+        try:
+            from diskcache import Cache
+        except ImportError:
+            print("diskcache is not installed, transcripts will not be cached")
+            _cache = False
+        else:
+            _cache = Cache(CACHE_DIR)
+    return _cache if _cache is not False else None
+
+
+def extract_transcript(video_id, use_cache=True):
+    """Return a cached transcript if available, otherwise extract and cache it."""
+    cache = _get_cache() if use_cache else None
+    key = ('transcript', video_id)
+    
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            print("Using cached transcript...")
+            return {**cached, "timestamp": time.time()}
     
-    return '. '.join(cleaned_sentences).strip()
+    result = extract_transcript_uncached(video_id)
+    
+    if cache is not None and result["success"]:
+        # The timestamp is stamped on read, keep it out of the cached value
+        cached = {k: v for k, v in result.items() if k != "timestamp"}
+        cache.set(key, cached, expire=CACHE_EXPIRE, tag='transcript')
+    
+    return result
 
 
-def extract_transcript(video_id):
-    """Try multiple methods to extract transcript."""
+def extract_transcript_uncached(video_id):
+    """Run the extraction methods as hedged requests and return the first success."""
     methods = [
         ("YouTube Transcript API", get_transcript_youtube_api),
         ("yt-dlp", get_transcript_yt_dlp)
@@ -182,11 +295,38 @@ def extract_transcript(video_id):
     
     errors = []
     
-    for method_name, method_func in methods:
+    results = queue.Queue()
+    failed = threading.Event()
+    finished = threading.Event()
+    
+    def run_method(index, method_name, method_func):
+        # Later methods only start once the earlier ones had their head start or failed
+        if index:
+            failed.wait(timeout=index * METHOD_HEDGE_DELAY)
+        if finished.is_set():
+            return
+        print(f"Trying {method_name}...")
         try:
-            print(f"Trying {method_name}...")
-            text, source = method_func(video_id)
+            results.put((method_name, method_func(video_id), None))
+        except Exception as e:
+            failed.set()
+            results.put((method_name, None, e))
+    
+    # Daemon threads so a losing method never keeps the process alive
+    for index, (method_name, method_func) in enumerate(methods):
+        threading.Thread(target=run_method, args=(index, method_name, method_func), daemon=True).start()
+    
+    try:
+        for _ in methods:
+            method_name, outcome, error = results.get()
+            
+            if error is not None:
+                error_msg = f"{method_name}: {str(error)}"
+                errors.append(error_msg)
+                print(f"Failed: {error_msg}")
+                continue
             
+            text, source = outcome
             if text and text.strip():
                 cleaned_text = clean_transcript_text(text)
                 return {
@@ -194,40 +334,101 @@ def extract_transcript(video_id):
                     "video_id": video_id,
                     "transcript": cleaned_text,
                     "method_used": source,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": time.time(),
                     "word_count": len(cleaned_text.split()),
                     "character_count": len(cleaned_text)
                 }
-        except Exception as e:
-            error_msg = f"{method_name}: {str(e)}"
-            errors.append(error_msg)
-            print(f"Failed: {error_msg}")
+            
+            # An empty result counts as a failure for hedging purposes
+            failed.set()
+    finally:
+        # Methods that have not started yet are skipped
+        finished.set()
     
     return {
         "success": False,
         "video_id": video_id,
         "errors": errors,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": time.time()
+    }
+
+
+async def _fetch_timedtext_async(session, video_id):
+    """Async counterpart of _fetch_timedtext using an httpx.AsyncClient."""
+    url = TIMEDTEXT_URL.format(video_id=video_id)
+    response = await session.get(url, timeout=30)
+    response.raise_for_status()
+    return _parse_timedtext(response.content)
+
+
+async def extract_transcript_async(video_id, session=None):
+    """Extract a transcript from the timedtext endpoint without blocking the event loop."""
+    if session is None:
+        import httpx
+        async with httpx.AsyncClient() as session:
+            return await extract_transcript_async(video_id, session)
+    
+    try:
+        text = await _fetch_timedtext_async(session, video_id)
+        if not text.strip():
+            raise Exception("No text found in timedtext response")
+    except Exception as e:
+        return {
+            "success": False,
+            "video_id": video_id,
+            "errors": [f"timedtext: {str(e)}"],
+            "timestamp": time.time()
+        }
+    
+    cleaned_text = clean_transcript_text(text)
+    return {
+        "success": True,
+        "video_id": video_id,
+        "transcript": cleaned_text,
+        "method_used": "timedtext",
+        "timestamp": time.time(),
+        "word_count": len(cleaned_text.split()),
+        "character_count": len(cleaned_text)
     }
 
 
+async def extract_batch(video_ids, concurrency=16):
+    """Extract transcripts for many videos concurrently over one httpx client."""
+    import httpx
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async with httpx.AsyncClient() as session:
+        async def extract_one(video_id):
+            async with semaphore:
+                return await extract_transcript_async(video_id, session)
+        
+        return await asyncio.gather(*(extract_one(video_id) for video_id in video_ids))
+
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python youtube_transcript_extractor.py <video_url_or_id>")
+    args = sys.argv[1:]
+    use_cache = '--no-cache' not in args
+    args = [arg for arg in args if arg != '--no-cache']
+    
+    if len(args) != 1:
+        print("Usage: python youtube_transcript_extractor.py [--no-cache] <video_url_or_id>")
         sys.exit(1)
     
-    video_input = sys.argv[1]
+    video_input = args[0]
     
     try:
         video_id = extract_video_id(video_input)
         print(f"Extracting transcript for video ID: {video_id}")
         
-        result = extract_transcript(video_id)
+        result = extract_transcript(video_id, use_cache=use_cache)
         
         print("\n" + "="*50)
         print("TRANSCRIPT RESULT (JSON)")
         print("="*50)
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        # Timestamps are epoch seconds internally and only formatted for output
+        output = {**result, "timestamp": datetime.fromtimestamp(result["timestamp"]).isoformat()}
+        print(json.dumps(output, indent=2, ensure_ascii=False))
         
         if not result["success"]:
             sys.exit(1)